@@ -7,79 +7,541 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import tensorflow as tf
 from tensorflow.keras.models import load_model
-from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
+import cv2
 import numpy as np
+import orjson
 from PIL import Image
+from cachetools import LRUCache
+from concurrent.futures import Future
+import glob
+import hashlib
 import io
+import os
+import platform
+import queue
+import threading
 import time
 
+# Optional libjpeg-turbo decoder for JPEG uploads; needs the native
+# libturbojpeg library, otherwise Pillow decodes everything
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJFLAG_FASTDCT, TJFLAG_FASTUPSAMPLE
+    jpeg_decoder = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    jpeg_decoder = None
+
 app = Flask(__name__)
 CORS(app)  # Enable Cross-Origin requests
 
 # Disease class names (must match training order)
 CLASS_NAMES = ['Early Blight', 'Late Blight', 'Healthy']
 
-# Global variables to store loaded models
-custom_cnn_model = None
-mobilenet_model = None
+# Model input sizes (width, height)
+CNN_INPUT_SIZE = (256, 256)
+MOBILENET_INPUT_SIZE = (224, 224)
 
-def load_models():
-    """Load both models at startup to avoid repeated loading"""
-    global custom_cnn_model, mobilenet_model
+# Directory holding the trained .h5 models and their converted .tflite files
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# Full-integer (int8) models are only produced for ARM / Edge TPU targets,
+# since TFLite int8 kernels are slower than float on x86 CPUs
+TARGET_ARCH = os.environ.get('TARGET_ARCH', platform.machine()).lower()
+INT8_ARCHS = {'arm64', 'aarch64', 'edgetpu'}
+USE_INT8 = TARGET_ARCH in INT8_ARCHS
+
+# Sample leaf images used to calibrate int8 quantization ranges
+CALIBRATION_DIR = os.environ.get(
+    'CALIBRATION_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'leaf_images')
+)
+
+# Optional external delegate library (e.g. libxnnpack_delegate.so).
+# When unset, TFLite's built-in XNNPACK delegate handles float models.
+TFLITE_DELEGATE = os.environ.get('TFLITE_DELEGATE')
+
+# Inference backend: 'tflite' (default) or 'keras' for XLA-compiled
+# TensorFlow concrete functions of the original Keras models
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'tflite').lower()
+
+# Global TFLite interpreters: one per model and batch bucket, {bucket: interp}
+cnn_interp = None
+mobile_interp = None
+
+# Cached input/output tensor details for each model's interpreters, keyed by model name
+interpreter_details = {}
+
+# Concrete functions used by the 'keras' backend, keyed by model name
+keras_functions = {}
+
+# Zero-input inferences run per model at startup, so kernel selection,
+# workspace allocation and XLA compilation do not slow the first request
+WARMUP_RUNS = 3
+
+# Concurrent /predict calls are coalesced into batches of up to MAX_BATCH
+# images, waiting at most BATCH_WAIT_TIMEOUT_S for a batch to fill up.
+# Each batch runs at the smallest bucket size that fits it (padded), so a
+# lone upload runs at batch size 1
+BATCH_BUCKETS = (1, 2, 4, 8)
+MAX_BATCH = BATCH_BUCKETS[-1]
+BATCH_WAIT_TIMEOUT_S = 0.01
+
+# Pre-allocated model input buffers (one row per batch slot)
+CNN_BUF = None
+MOBILE_BUF = None
+
+# The models and the input buffers are not thread-safe, so a single
+# worker thread owns them and serves queued (img_256, img_224, future) items
+request_queue = queue.Queue()
+batch_worker_thread = None
+batch_worker_lock = threading.Lock()
+
+# Model results for recently seen uploads, keyed by a hash of the image bytes
+prediction_cache = LRUCache(maxsize=256)
+prediction_cache_lock = threading.Lock()
+
+def representative_dataset(preprocess_fn):
+    """Yield preprocessed calibration images for int8 quantization"""
+    paths = sorted(
+        glob.glob(os.path.join(CALIBRATION_DIR, '*.jpg')) +
+        glob.glob(os.path.join(CALIBRATION_DIR, '*.jpeg'))
+    )
+    for path in paths[:100]:
+        with open(path, 'rb') as f:
+            image = decode_image(f.read())
+        yield [preprocess_fn(image).astype(np.float32)]
+
+def build_serving_function(model, jit_compile=False):
+    """
+    Wrap a Keras model so the graph also computes the top-1 prediction
+    - The batch dimension is left open (None); the saved models carry
+      their training batch size, which would otherwise be traced in
+    Outputs: probabilities, top_index, top_probability
+    """
+    @tf.function(
+        input_signature=[tf.TensorSpec([None, *model.input_shape[1:]], tf.float32)],
+        jit_compile=jit_compile
+    )
+    def serve(images):
+        probabilities = model(images, training=False)
+        top = tf.math.top_k(probabilities, k=1)
+        return {
+            "probabilities": probabilities,
+            "top_index": top.indices,
+            "top_probability": top.values
+        }
+    return serve
+
+def convert_to_tflite(h5_path, tflite_path, preprocess_fn):
+    """
+    Convert a trained Keras .h5 model (plus a top-1 TopK op) to a TFLite FlatBuffer
+    - ARM / Edge TPU targets: full-integer model with uint8 input/output
+    - Other targets: float16 weights, activations stay float32
+    Returns: path of the written .tflite file
+    """
+    model = load_model(h5_path)
+    serve = build_serving_function(model)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [serve.get_concrete_function()], model
+    )
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    
+    if USE_INT8:
+        converter.representative_dataset = lambda: representative_dataset(preprocess_fn)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+    else:
+        converter.target_spec.supported_types = [tf.float16]
+    
+    tflite_model = converter.convert()
+    
+    with open(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+    return tflite_path
+
+def load_interpreter(tflite_path, model_name):
+    """
+    Create one multi-threaded TFLite interpreter per batch bucket, each
+    allocated once for its batch size, and cache their tensor details
+    Returns: dict mapping bucket size to interpreter
+    """
+    delegates = None
+    if TFLITE_DELEGATE:
+        delegates = [tf.lite.experimental.load_delegate(TFLITE_DELEGATE)]
+    
+    interps = {}
+    for bucket in BATCH_BUCKETS:
+        interp = tf.lite.Interpreter(
+            model_path=tflite_path,
+            num_threads=os.cpu_count(),
+            experimental_delegates=delegates
+        )
+        
+        # potatoes.h5 was built with a fixed batch of 32; the converted graph
+        # must accept any batch size or single-image requests cannot run
+        input_details = interp.get_input_details()[0]
+        if input_details["shape_signature"][0] != -1:
+            raise ValueError(f"{model_name} TFLite model has a fixed batch size")
+        
+        interp.resize_tensor_input(input_details["index"], [bucket, *input_details["shape"][1:]])
+        interp.allocate_tensors()
+        interps[bucket] = interp
+    
+    # Tensor indices and quantization are the same for every bucket
+    interpreter_details[model_name] = read_tensor_details(interps[BATCH_BUCKETS[0]])
+    return interps
+
+def read_tensor_details(interp):
+    """
+    Look up the input tensor and the three serving outputs of an interpreter
+    TFLite does not keep the output order, so outputs are told apart by
+    dtype (int32 index) and shape (one value vs. one per class)
+    """
+    details = {"input": interp.get_input_details()[0]}
+    for output in interp.get_output_details():
+        if output["dtype"] == np.int32:
+            details["top_index"] = output
+        elif output["shape"][-1] == len(CLASS_NAMES):
+            details["probabilities"] = output
+        else:
+            details["top_probability"] = output
+    return details
+
+def load_keras_function(h5_path, model_name):
+    """
+    Load a Keras model as an XLA-compiled concrete function
+    Avoids model.predict's per-call Python overhead when not using TFLite
+    - Traced with a None batch dimension (not the fixed training batch
+      stored in the .h5 file); XLA compiles once per batch bucket shape
+    """
+    model = load_model(h5_path)
+    serve = build_serving_function(model, jit_compile=True)
+    keras_functions[model_name] = serve.get_concrete_function()
+
+def load_keras_models():
+    """Load both models as compiled Keras concrete functions"""
+    print("Inference backend: Keras (XLA-compiled concrete functions)")
     
     print("Loading Custom CNN model...")
-    custom_cnn_model = load_model('models/potatoes.h5')
+    load_keras_function(os.path.join(MODELS_DIR, 'potatoes.h5'), "Custom CNN")
     print("Custom CNN loaded successfully!")
     
     print("Loading MobileNetV2 model...")
-    mobilenet_model = load_model('models/mobilenetv2_potato.h5')
+    load_keras_function(os.path.join(MODELS_DIR, 'mobilenetv2_potato.h5'), "MobileNetV2")
+    print("MobileNetV2 loaded successfully!")
+
+def load_tflite_models():
+    """Convert both models to TFLite and create their interpreters"""
+    global cnn_interp, mobile_interp
+    
+    # Keep int8 and float variants side by side under different names
+    suffix = '_int8' if USE_INT8 else ''
+    print(f"Target architecture: {TARGET_ARCH} ({'int8' if USE_INT8 else 'float16'} models)")
+    
+    print("Converting Custom CNN model to TFLite...")
+    cnn_path = convert_to_tflite(
+        os.path.join(MODELS_DIR, 'potatoes.h5'),
+        os.path.join(MODELS_DIR, f'potatoes{suffix}.tflite'),
+        preprocess_image_custom_cnn
+    )
+    cnn_interp = load_interpreter(cnn_path, "Custom CNN")
+    print("Custom CNN loaded successfully!")
+    
+    print("Converting MobileNetV2 model to TFLite...")
+    mobile_path = convert_to_tflite(
+        os.path.join(MODELS_DIR, 'mobilenetv2_potato.h5'),
+        os.path.join(MODELS_DIR, f'mobilenetv2_potato{suffix}.tflite'),
+        preprocess_image_mobilenet
+    )
+    mobile_interp = load_interpreter(mobile_path, "MobileNetV2")
     print("MobileNetV2 loaded successfully!")
 
-def preprocess_image_custom_cnn(image):
+def warm_up_models():
+    """
+    Run WARMUP_RUNS inferences on zero inputs through each model
+    - Covers every batch bucket, the only shapes the batch worker runs
+    """
+    for interp, model_name, input_size in (
+        (cnn_interp, "Custom CNN", CNN_INPUT_SIZE),
+        (mobile_interp, "MobileNetV2", MOBILENET_INPUT_SIZE)
+    ):
+        for bucket in BATCH_BUCKETS:
+            dummy = np.zeros((bucket, input_size[1], input_size[0], 3), dtype=np.float32)
+            for _ in range(WARMUP_RUNS):
+                predict_with_model(interp, dummy, model_name)
+
+def load_models():
+    """Load both models once at startup and warm them up"""
+    global CNN_BUF, MOBILE_BUF
+    
+    CNN_BUF = np.zeros(
+        (MAX_BATCH, CNN_INPUT_SIZE[1], CNN_INPUT_SIZE[0], 3), dtype=np.float32
+    )
+    MOBILE_BUF = np.zeros(
+        (MAX_BATCH, MOBILENET_INPUT_SIZE[1], MOBILENET_INPUT_SIZE[0], 3), dtype=np.float32
+    )
+    
+    if INFERENCE_BACKEND == 'keras':
+        load_keras_models()
+    else:
+        load_tflite_models()
+    
+    print("Warming up models...")
+    warm_up_models()
+
+def jpeg_scaling_factor(width, height, size):
+    """
+    Pick the smallest libjpeg-turbo scaling factor (num, denom) that still
+    decodes a width x height JPEG to at least `size`
+    """
+    candidates = [
+        (num, denom) for num, denom in jpeg_decoder.scaling_factors
+        if num <= denom
+        and width * num >= size[0] * denom
+        and height * num >= size[1] * denom
+    ]
+    return min(candidates, key=lambda factor: factor[0] / factor[1], default=(1, 1))
+
+def decode_image(image_bytes):
+    """
+    Decode uploaded image bytes into an RGB uint8 numpy array (H, W, 3)
+    - JPEGs use libjpeg-turbo (fast DCT and upsampling) when available
+    - PNGs and other formats fall back to Pillow
+    - Large JPEGs are scaled down during the IDCT, never below the
+      256x256 Custom CNN input, instead of decoding at full resolution
+    """
+    if jpeg_decoder is not None and image_bytes[:3] == b'\xff\xd8\xff':
+        try:
+            width, height = jpeg_decoder.decode_header(image_bytes)[:2]
+            return jpeg_decoder.decode(
+                image_bytes,
+                pixel_format=TJPF_RGB,
+                scaling_factor=jpeg_scaling_factor(width, height, CNN_INPUT_SIZE),
+                flags=TJFLAG_FASTDCT | TJFLAG_FASTUPSAMPLE
+            )
+        except OSError:
+            pass  # Let Pillow handle (or report) JPEGs turbojpeg rejects
+    
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('RGB', CNN_INPUT_SIZE)  # No-op for non-JPEG images
+    image.load()
+    
+    # Convert to RGB if necessary (handle PNG with transparency)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.asarray(image, dtype=np.uint8)
+
+def resize_image(image, size):
+    """
+    Resize an RGB uint8 array to size (width, height)
+    - Uses OpenCV's SIMD resize kernels
+    - Area averaging when shrinking by more than 2x (bilinear would only
+      sample ~2x2 source pixels and alias), bilinear otherwise
+    - Skipped when the image already has the target size
+    """
+    height, width = image.shape[:2]
+    if (width, height) == size:
+        return image
+    
+    if width > 2 * size[0] or height > 2 * size[1]:
+        interpolation = cv2.INTER_AREA
+    else:
+        interpolation = cv2.INTER_LINEAR
+    return cv2.resize(image, size, interpolation=interpolation)
+
+def preprocess_image_custom_cnn(image, row=0):
     """
     Preprocess image for Custom CNN
     - Resize to 256x256
     - Rescale pixel values to [0, 1]
+    - Fills row `row` of the shared CNN_BUF in place; only the batch
+      worker (or load_models, before it starts) may call this
     """
-    img = image.resize((256, 256))
-    img_array = np.array(img)
-    img_array = img_array / 255.0  # Rescale to [0, 1]
-    img_array = np.expand_dims(img_array, axis=0)  # Add batch dimension
+    img = resize_image(image, CNN_INPUT_SIZE)
+    img_array = CNN_BUF[row:row + 1]
+    np.copyto(img_array[0], img)
+    np.multiply(img_array, 1 / 255.0, out=img_array)  # Rescale to [0, 1]
     return img_array
 
-def preprocess_image_mobilenet(image):
+def preprocess_image_mobilenet(image, row=0):
     """
     Preprocess image for MobileNetV2
     - Resize to 224x224
-    - Apply MobileNetV2 preprocessing
+    - Scale pixel values to [-1, 1] (MobileNetV2's x / 127.5 - 1)
+    - Fills row `row` of the shared MOBILE_BUF in place; only the batch
+      worker (or load_models, before it starts) may call this
     """
-    img = image.resize((224, 224))
-    img_array = np.array(img)
-    img_array = np.expand_dims(img_array, axis=0)  # Add batch dimension
-    img_array = preprocess_input(img_array)  # MobileNetV2 preprocessing
+    img = resize_image(image, MOBILENET_INPUT_SIZE)
+    img_array = MOBILE_BUF[row:row + 1]
+    np.copyto(img_array[0], img)
+    np.multiply(img_array, 1 / 127.5, out=img_array)
+    np.subtract(img_array, 1.0, out=img_array)
     return img_array
 
-def predict_with_model(model, img_array, model_name):
+def quantize_input(img_array, input_details):
+    """Convert a float input to the interpreter's input type (uint8 for int8 models)"""
+    if input_details["dtype"] == np.uint8:
+        scale, zero_point = input_details["quantization"]
+        img_array = np.clip(np.round(img_array / scale + zero_point), 0, 255)
+    return img_array.astype(input_details["dtype"], copy=False)
+
+def dequantize_output(output, output_details):
+    """Convert a uint8 model output back to float probabilities"""
+    if output_details["dtype"] == np.uint8:
+        scale, zero_point = output_details["quantization"]
+        output = (output.astype(np.float32) - zero_point) * scale
+    return output
+
+def batch_bucket(count):
+    """Smallest batch bucket that holds `count` images"""
+    return next(bucket for bucket in BATCH_BUCKETS if bucket >= count)
+
+def invoke_tflite(interps, img_array, model_name):
+    """
+    Run the interpreter allocated for this batch's bucket size
+    Returns: probabilities, top_index, top_probability as numpy arrays and
+    the time spent in the interpreter call (ms)
+    """
+    details = interpreter_details[model_name]
+    interp = interps[len(img_array)]
+    img_array = quantize_input(img_array, details["input"])
+    
+    start_time = time.perf_counter_ns()
+    interp.set_tensor(details["input"]["index"], img_array)
+    interp.invoke()
+    predictions = interp.get_tensor(details["probabilities"]["index"])
+    top_index = interp.get_tensor(details["top_index"]["index"])
+    top_probability = interp.get_tensor(details["top_probability"]["index"])
+    inference_time_ms = (time.perf_counter_ns() - start_time) / 1e6
+    
+    predictions = dequantize_output(predictions, details["probabilities"])
+    top_probability = dequantize_output(top_probability, details["top_probability"])
+    return predictions, top_index, top_probability, inference_time_ms
+
+def invoke_keras(img_array, model_name):
+    """
+    Run a compiled Keras concrete function on a batch
+    Returns: probabilities, top_index, top_probability as numpy arrays and
+    the time spent in the function call (ms)
+    """
+    img_tensor = tf.constant(img_array)
+    
+    start_time = time.perf_counter_ns()
+    outputs = keras_functions[model_name](img_tensor)
+    predictions = outputs["probabilities"].numpy()
+    top_index = outputs["top_index"].numpy()
+    top_probability = outputs["top_probability"].numpy()
+    inference_time_ms = (time.perf_counter_ns() - start_time) / 1e6
+    return predictions, top_index, top_probability, inference_time_ms
+
+def predict_with_model(interp, img_array, model_name, count=None):
     """
-    Run prediction and measure inference time
-    Returns: predicted_class, confidence, inference_time
+    Run prediction on a batch of images and measure inference time
+    - Only the first `count` rows (default: all) hold real images
+    - Batches that are not a bucket size are zero-padded to the next bucket
+    - inference_time_ms is the batch latency: the duration of the single
+      model call that served every image in the batch, excluding
+      padding and (de)quantization
+    Returns: one (predicted_class, confidence, inference_time_ms, class_probabilities)
+    tuple per real image in the batch
     """
-    start_time = time.time()
-    predictions = model.predict(img_array, verbose=0)
-    inference_time = time.time() - start_time
+    if count is None:
+        count = len(img_array)
     
-    # Get predicted class and confidence
-    predicted_idx = np.argmax(predictions[0])
-    confidence = float(np.max(predictions[0]) * 100)
-    predicted_class = CLASS_NAMES[predicted_idx]
+    bucket = batch_bucket(len(img_array))
+    if len(img_array) < bucket:
+        padded = np.zeros((bucket, *img_array.shape[1:]), dtype=img_array.dtype)
+        padded[:len(img_array)] = img_array
+        img_array = padded
     
-    # Get all class probabilities
-    class_probabilities = {
-        CLASS_NAMES[i]: float(predictions[0][i] * 100) 
-        for i in range(len(CLASS_NAMES))
-    }
+    if INFERENCE_BACKEND == 'keras':
+        predictions, top_index, top_probability, inference_time_ms = invoke_keras(
+            img_array, model_name
+        )
+    else:
+        predictions, top_index, top_probability, inference_time_ms = invoke_tflite(
+            interp, img_array, model_name
+        )
+    predictions = predictions[:count]
+    top_index = top_index[:count]
+    top_probability = top_probability[:count]
+    
+    # Percentages rounded to 2 decimals for the whole batch in one step
+    # (float64 so the rounded values convert to clean Python floats)
+    predicted_idx = top_index[:, 0].tolist()
+    confidences = np.round(top_probability[:, 0].astype(np.float64) * 100, 2).tolist()
+    probs100 = np.round(predictions.astype(np.float64) * 100, 2).tolist()
+    
+    results = []
+    for idx, confidence, probs in zip(predicted_idx, confidences, probs100):
+        predicted_class = CLASS_NAMES[idx]
+        class_probabilities = dict(zip(CLASS_NAMES, probs))
+        results.append((predicted_class, confidence, inference_time_ms, class_probabilities))
+    
+    return results
+
+def run_batch(batch):
+    """
+    Run both models on a batch of (img_256, img_224) image pairs
+    Returns: one (cnn_result, mobilenet_result) pair per image
+    """
+    for row, (img_256, img_224) in enumerate(batch):
+        preprocess_image_custom_cnn(img_256, row)
+        preprocess_image_mobilenet(img_224, row)
+    
+    # Run the smallest bucket that fits the batch; rows past len(batch)
+    # hold stale or zero data and are ignored
+    bucket = batch_bucket(len(batch))
+    cnn_results = predict_with_model(cnn_interp, CNN_BUF[:bucket], "Custom CNN", len(batch))
+    mobile_results = predict_with_model(
+        mobile_interp, MOBILE_BUF[:bucket], "MobileNetV2", len(batch)
+    )
+    return list(zip(cnn_results, mobile_results))
+
+def batch_worker():
+    """Collect queued requests into batches and resolve their futures"""
+    while True:
+        items = [request_queue.get()]
+        deadline = time.monotonic() + BATCH_WAIT_TIMEOUT_S
+        while len(items) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(request_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        try:
+            results = run_batch([(img_256, img_224) for img_256, img_224, _ in items])
+        except Exception as e:
+            for _, _, future in items:
+                future.set_exception(e)
+            continue
+        
+        for (_, _, future), result in zip(items, results):
+            future.set_result(result)
+
+def submit_for_prediction(img_256, img_224):
+    """
+    Queue an image pair for the batch worker
+    Returns: Future resolving to (cnn_result, mobilenet_result)
+    """
+    global batch_worker_thread
     
-    return predicted_class, confidence, inference_time, class_probabilities
+    # Started lazily so the thread exists in the serving process
+    with batch_worker_lock:
+        if batch_worker_thread is None or not batch_worker_thread.is_alive():
+            batch_worker_thread = threading.Thread(target=batch_worker, daemon=True)
+            batch_worker_thread.start()
+    
+    future = Future()
+    request_queue.put((img_256, img_224, future))
+    return future
+
+def json_response(body):
+    """Wrap JSON bytes serialized with orjson in a Flask response"""
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -101,55 +563,72 @@ def predict():
         
         # Read and open image
         image_bytes = file.read()
-        image = Image.open(io.BytesIO(image_bytes))
         
-        # Convert to RGB if necessary (handle PNG with transparency)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        # Re-uploads of the same image skip preprocessing and inference
+        cache_key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        with prediction_cache_lock:
+            cached_results = prediction_cache.get(cache_key)
         
-        # === Custom CNN Prediction ===
-        img_cnn = preprocess_image_custom_cnn(image)
-        cnn_class, cnn_conf, cnn_time, cnn_probs = predict_with_model(
-            custom_cnn_model, img_cnn, "Custom CNN"
-        )
+        if cached_results is not None:
+            cnn_result, mobile_result = cached_results
+        else:
+            image = decode_image(image_bytes)
+            
+            # Both model inputs are resized from the same decoded RGB array
+            img_256 = resize_image(image, CNN_INPUT_SIZE)
+            img_224 = resize_image(image, MOBILENET_INPUT_SIZE)
+            
+            # === Custom CNN + MobileNetV2 Prediction (batched) ===
+            cnn_result, mobile_result = submit_for_prediction(img_256, img_224).result()
+            with prediction_cache_lock:
+                prediction_cache[cache_key] = (cnn_result, mobile_result)
         
-        # === MobileNetV2 Prediction ===
-        img_mobile = preprocess_image_mobilenet(image)
-        mobile_class, mobile_conf, mobile_time, mobile_probs = predict_with_model(
-            mobilenet_model, img_mobile, "MobileNetV2"
-        )
+        cnn_class, cnn_conf, cnn_time_ms, cnn_probs = cnn_result
+        mobile_class, mobile_conf, mobile_time_ms, mobile_probs = mobile_result
+        
+        # No inference ran for a cached result, so no time is reported
+        if cached_results is not None:
+            cnn_time_ms = mobile_time_ms = 0.0
         
         # Prepare response
         response = {
             "custom_cnn": {
                 "prediction": cnn_class,
-                "confidence": round(cnn_conf, 2),
-                "inference_time_ms": round(cnn_time * 1000, 2),
-                "class_probabilities": {k: round(v, 2) for k, v in cnn_probs.items()}
+                "confidence": cnn_conf,
+                "inference_time_ms": round(cnn_time_ms, 2),
+                "class_probabilities": cnn_probs
             },
             "mobilenet": {
                 "prediction": mobile_class,
-                "confidence": round(mobile_conf, 2),
-                "inference_time_ms": round(mobile_time * 1000, 2),
-                "class_probabilities": {k: round(v, 2) for k, v in mobile_probs.items()}
+                "confidence": mobile_conf,
+                "inference_time_ms": round(mobile_time_ms, 2),
+                "class_probabilities": mobile_probs
             },
-            "agreement": cnn_class == mobile_class
+            "agreement": cnn_class == mobile_class,
+            "cached": cached_results is not None
         }
         
-        return jsonify(response)
+        # orjson is much faster than the stdlib json used by jsonify
+        return json_response(orjson.dumps(response))
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-if __name__ == '__main__':
-    # Load models before starting server
+def create_app():
+    """
+    Application factory for production WSGI servers
+    Loads the models once and returns the Flask app, e.g.:
+        gunicorn -w 1 -k gthread --threads 8 'app:create_app()'
+    """
     load_models()
     
-    # Start Flask server
     print("\n" + "="*50)
     print("🥔 Potato Disease Classification Backend")
     print("="*50)
-    print("Server running on http://localhost:5000")
     print("Ready to accept predictions!\n")
-    
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    return app
+
+if __name__ == '__main__':
+    # Local fallback (e.g. on Windows, where Gunicorn is unavailable).
+    # debug=False: the reloader would load both models a second time.
+    create_app().run(debug=False, port=5000)
\ No newline at end of file
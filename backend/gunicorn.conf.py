@@ -0,0 +1,16 @@
+"""
+Gunicorn configuration for the Potato Disease Classification backend
+Run from the backend directory:
+    gunicorn 'app:create_app()'
+"""
+
+bind = "127.0.0.1:5000"
+
+# A single worker process holds both models and the batch worker thread;
+# request threads feed it concurrently
+workers = 1
+worker_class = "gthread"
+threads = 8
+
+# No preload_app: TensorFlow / TFLite thread pools do not survive fork(),
+# so the models are loaded inside the worker process itself
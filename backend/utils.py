@@ -40,14 +40,14 @@ def preprocess_for_custom_cnn(image, target_size=(256, 256)):
     Returns:
         Preprocessed numpy array ready for prediction
     """
-    # Resize image
-    img = image.resize(target_size)
+    # Resize image (bilinear)
+    img = image.resize(target_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
     
-    # Convert to array
-    img_array = np.array(img)
+    # Convert to a float32 array
+    img_array = np.asarray(img, dtype=np.float32)
     
-    # Normalize to [0, 1] range
-    img_array = img_array / 255.0
+    # Normalize to [0, 1] range (in place, no float64 temporary)
+    img_array *= (1.0 / 255.0)
     
     # Add batch dimension
     img_array = np.expand_dims(img_array, axis=0)
@@ -65,8 +65,8 @@ def preprocess_for_mobilenet(image, target_size=(224, 224)):
     Returns:
         Preprocessed numpy array ready for prediction
     """
-    # Resize image
-    img = image.resize(target_size)
+    # Resize image (bilinear)
+    img = image.resize(target_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
     
     # Convert to array
     img_array = np.array(img)
@@ -90,24 +90,24 @@ def get_prediction_details(predictions, class_names=CLASS_NAMES):
     Returns:
         Dictionary with prediction details
     """
+    probs = np.asarray(predictions[0], dtype=np.float64)
+    
     # Get predicted class index
-    predicted_idx = np.argmax(predictions[0])
+    predicted_idx = int(probs.argmax())
     
-    # Get confidence score
-    confidence = float(np.max(predictions[0]) * 100)
+    # Round all class probabilities (as percentages) in one vectorized step
+    probs100 = np.round(probs * 100, 2).tolist()
     
-    # Get predicted class name
+    # Get predicted class name and confidence score
     predicted_class = class_names[predicted_idx]
+    confidence = probs100[predicted_idx]
     
     # Get all class probabilities
-    class_probabilities = {
-        class_names[i]: float(predictions[0][i] * 100) 
-        for i in range(len(class_names))
-    }
+    class_probabilities = dict(zip(class_names, probs100))
     
     return {
         'predicted_class': predicted_class,
-        'confidence': round(confidence, 2),
+        'confidence': confidence,
         'class_probabilities': class_probabilities
     }
 
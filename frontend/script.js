@@ -108,7 +108,7 @@ function displayResults(data) {
     // === Custom CNN Results ===
     document.getElementById('cnnPrediction').textContent = data.custom_cnn.prediction;
     document.getElementById('cnnConfidence').textContent = `${data.custom_cnn.confidence}% Confidence`;
-    document.getElementById('cnnTime').textContent = `${data.custom_cnn.inference_time_ms} ms`;
+    document.getElementById('cnnTime').textContent = formatInferenceTime(data, data.custom_cnn);
     
     const cnnBar = document.getElementById('cnnConfidenceBar');
     cnnBar.style.width = `${data.custom_cnn.confidence}%`;
@@ -116,7 +116,7 @@ function displayResults(data) {
     // === MobileNetV2 Results ===
     document.getElementById('mobilenetPrediction').textContent = data.mobilenet.prediction;
     document.getElementById('mobilenetConfidence').textContent = `${data.mobilenet.confidence}% Confidence`;
-    document.getElementById('mobilenetTime').textContent = `${data.mobilenet.inference_time_ms} ms`;
+    document.getElementById('mobilenetTime').textContent = formatInferenceTime(data, data.mobilenet);
     
     const mobileBar = document.getElementById('mobilenetConfidenceBar');
     mobileBar.style.width = `${data.mobilenet.confidence}%`;
@@ -141,6 +141,16 @@ function displayResults(data) {
     createProbabilityChart(data);
 }
 
+/**
+ * Format a model's inference time (cached results had no inference)
+ */
+function formatInferenceTime(data, modelResult) {
+    if (data.cached) {
+        return 'Cached result';
+    }
+    return `${modelResult.inference_time_ms} ms`;
+}
+
 /**
  * Create confidence comparison bar chart
  */